@@ -0,0 +1,46 @@
+# benchmarks/bench_endpoints.py
+"""Endpoint load tests against the Flask app with the offline stand-ins installed."""
+import io
+
+import main
+from benchmarks.bench_micro import make_frame
+from benchmarks.harness import load_test
+
+SUITE = "endpoint"
+BENCH_BUCKET = "bench-bucket"
+HEADERS = {"Accept-Encoding": "gzip"}  # what the Streamlit frontend sends
+
+
+def run(env, quick: bool = False, concurrency: int = 1, total_requests: int = None) -> list:
+    """
+    `env` is an active benchmarks.fakes.OfflineEnvironment.
+    concurrency defaults to 1 to match the Dockerfile (one sync gunicorn worker);
+    summarize_dataframe draws through pyplot, which is not thread-safe.
+    """
+    total = total_requests or (20 if quick else 100)
+    rows = 1000 if quick else 5000
+    csv_bytes = make_frame(rows, 8).to_csv(index=False).encode("utf-8")
+    gcs_path = f"gs://{BENCH_BUCKET}/bench.csv"
+    env.storage.put(gcs_path, csv_bytes)
+
+    old_bucket, main.BUCKET = main.BUCKET, BENCH_BUCKET
+    try:
+        cases = [
+            ("GET /health", lambda c: c.get("/health", headers=HEADERS)),
+            ("POST /upload", lambda c: c.post(
+                "/upload", data={"file": (io.BytesIO(csv_bytes), "bench.csv")},
+                content_type="multipart/form-data", headers=HEADERS)),
+            ("POST /summarize", lambda c: c.post("/summarize", json={"gcs_path": gcs_path}, headers=HEADERS)),
+            ("POST /debug_sql", lambda c: c.post("/debug_sql", json={"question": "average age"}, headers=HEADERS)),
+            ("POST /nl_query_db", lambda c: c.post(
+                "/nl_query_db", json={"question": "show students", "target": "cloudsql"}, headers=HEADERS)),
+            ("POST /nl_query_db[duplicates]", lambda c: c.post(
+                "/nl_query_db", json={"question": "count duplicates", "target": "cloudsql"}, headers=HEADERS)),
+        ]
+        results = []
+        for name, request_fn in cases:
+            results.append(load_test(SUITE, name, main.app.test_client, request_fn, total_requests=total,
+                                     concurrency=concurrency, params={"rows": rows, "db": env.db}))
+        return results
+    finally:
+        main.BUCKET = old_bucket
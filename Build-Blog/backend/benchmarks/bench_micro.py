@@ -0,0 +1,109 @@
+# benchmarks/bench_micro.py
+"""Micro-benchmarks: file loading, summaries, chart rendering and NL -> SQL parsing."""
+import io
+import json
+
+import numpy as np
+import pandas as pd
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+
+import nl_to_sql
+from main import load_df_any
+from analysis_utils import summarize_dataframe, df_to_b64_png_fig
+from benchmarks.harness import bench
+
+SUITE = "micro"
+
+
+def make_frame(rows: int, cols: int, seed: int = 0) -> pd.DataFrame:
+    """Half numeric (with ~5% NaN), half low-cardinality categorical columns."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for i in range(cols):
+        if i % 2 == 0:
+            col = rng.normal(50, 10, size=rows)
+            col[rng.random(rows) < 0.05] = np.nan
+            data[f"num_{i}"] = col
+        else:
+            data[f"cat_{i}"] = rng.choice(["alpha", "beta", "gamma", "delta"], size=rows)
+    return pd.DataFrame(data)
+
+
+def encode_frame(df: pd.DataFrame, fmt: str) -> bytes:
+    if fmt == "csv":
+        return df.to_csv(index=False).encode("utf-8")
+    if fmt == "json":
+        return df.to_json(orient="records").encode("utf-8")
+    if fmt == "xlsx":
+        buf = io.BytesIO()
+        df.to_excel(buf, index=False)
+        return buf.getvalue()
+    raise ValueError(fmt)
+
+
+def bench_load_df_any(rows: int, repeat: int) -> list:
+    df = make_frame(rows, 8)
+    results = []
+    for fmt in ("csv", "json", "xlsx"):
+        try:
+            raw = encode_frame(df, fmt)
+        except ImportError:
+            continue  # no Excel writer installed
+        name, params = f"load_df_any[{fmt}]", {"rows": rows, "bytes": len(raw)}
+        loaded = load_df_any(raw)
+        if loaded.shape != df.shape:
+            # e.g. records JSON is accepted by the read_csv attempt and comes back as 0 x N
+            results.append({"suite": SUITE, "name": name, "params": params,
+                            "error": f"load_df_any returned shape {loaded.shape}, expected {df.shape}"})
+            continue
+        results.append(bench(SUITE, name, lambda: load_df_any(raw), repeat=repeat, params=params))
+    return results
+
+
+def bench_summarize(shapes: list, repeat: int) -> list:
+    results = []
+    for rows, cols in shapes:
+        df = make_frame(rows, cols)
+        results.append(bench(SUITE, f"summarize_dataframe[{rows}x{cols}]", lambda: summarize_dataframe(df),
+                             repeat=repeat, params={"rows": rows, "cols": cols}))
+    return results
+
+
+def bench_chart(rows: int, repeat: int) -> list:
+    series = make_frame(rows, 1)["num_0"].dropna()
+
+    def render():
+        fig = plt.figure()
+        series.hist(bins=30)
+        df_to_b64_png_fig(fig)
+        plt.close(fig)
+
+    return [bench(SUITE, "chart_histogram_png", render, repeat=repeat, params={"rows": rows})]
+
+
+def bench_nl_to_sql(repeat: int) -> list:
+    fallback = nl_to_sql.generate_text_fallback("average age")
+    clean = json.dumps(fallback)
+    wrapped = "Here is the query:\n```json\n" + clean + "\n```"
+    results = [
+        bench(SUITE, "parse_sql_json[clean]", lambda: nl_to_sql._parse_sql_json(clean), repeat=repeat * 50),
+        bench(SUITE, "parse_sql_json[wrapped]", lambda: nl_to_sql._parse_sql_json(wrapped), repeat=repeat * 50),
+        bench(SUITE, "parse_sql_json[invalid]", lambda: nl_to_sql._parse_sql_json("no json here"), repeat=repeat * 50),
+        # end-to-end through the resilience layer with the fake model installed by the caller
+        bench(SUITE, "nl_to_sql[fake_model]", lambda: nl_to_sql.nl_to_sql("average age of students"), repeat=repeat * 5),
+    ]
+    return results
+
+
+def run(quick: bool = False) -> list:
+    repeat = 5 if quick else 20
+    rows = 2000 if quick else 20000
+    shapes = [(1000, 4), (10000, 8)] if quick else [(1000, 4), (10000, 8), (100000, 8), (10000, 32)]
+    results = []
+    results += bench_load_df_any(rows, repeat)
+    results += bench_summarize(shapes, max(3, repeat // 4))
+    results += bench_chart(rows, repeat)
+    results += bench_nl_to_sql(repeat)
+    return results
@@ -0,0 +1,132 @@
+# benchmarks/bench_serialization.py
+"""
+Compares JSON encoders and response compression on /nl_query_db and /summarize payloads.
+
+    cd Build-Blog/backend
+    python -m benchmarks.bench_serialization --rows 20000
+"""
+import sys
+import json
+import time
+import argparse
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from analysis_utils import summarize_dataframe
+import serialization
+
+
+def nl_query_db_payload(n_rows: int) -> dict:
+    # Shape of run_cloudsql_query() output: pymysql returns Decimal/datetime/None values
+    start = datetime(2024, 1, 1)
+    rows = [
+        {
+            "student_id": i,
+            "name": f"student-{i}",
+            "department": ("CSE", "ECE", "MECH", None)[i % 4],
+            "avg_marks": Decimal(f"{50 + i % 50}.{i % 100:02d}"),
+            "enrolled_at": start + timedelta(minutes=i),
+        }
+        for i in range(n_rows)
+    ]
+    return {"sql": "SELECT * FROM students;", "rows": rows, "explain": "benchmark"}
+
+
+def summarize_payload(n_rows: int, n_cols: int = 8) -> dict:
+    rng = np.random.default_rng(0)
+    data = {f"num_{i}": rng.normal(size=n_rows) for i in range(n_cols // 2)}
+    for i in range(n_cols - n_cols // 2):
+        data[f"cat_{i}"] = rng.choice(["a", "b", "c", None], size=n_rows)
+    df = pd.DataFrame(data)
+    df.iloc[::7, 0] = np.nan
+    df["ts"] = pd.date_range("2024-01-01", periods=n_rows, freq="min")
+    df.loc[df.index[::11], "ts"] = pd.NaT
+    summary, charts = summarize_dataframe(df)
+    return {"summary": summary, "charts": charts}
+
+
+def _best_of(fn, repeat: int):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def _reject_constant(name):
+    # NaN/Infinity literals are accepted by json.loads but are not valid JSON
+    raise ValueError(f"invalid JSON constant {name}")
+
+
+def _encoders() -> dict:
+    flask_default = DefaultJSONProvider(Flask(__name__))
+    encoders = {"flask-default": lambda o: flask_default.dumps(o).encode("utf-8")}
+    encoders.update(serialization.ENCODERS)
+    return encoders
+
+
+def bench_payload(name: str, payload, repeat: int) -> list:
+    results = []
+    for enc_name, encode in _encoders().items():
+        row = {"payload": name, "encoder": enc_name}
+        try:
+            row["encode_ms"], body = _best_of(lambda: encode(payload), repeat)
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+            results.append(row)
+            continue
+        row["encode_ms"] *= 1000
+        row["bytes"] = len(body)
+        try:
+            json.loads(body, parse_constant=_reject_constant)
+            row["valid_json"] = True
+        except ValueError:
+            row["valid_json"] = False
+        for encoding in ("gzip", "zstd"):
+            if encoding == "zstd" and serialization.zstandard is None:
+                continue
+            secs, packed = _best_of(lambda: serialization.compress(body, encoding), repeat)
+            row[f"{encoding}_ms"] = secs * 1000
+            row[f"{encoding}_bytes"] = len(packed)
+        results.append(row)
+    return results
+
+
+def _print_table(results: list):
+    cols = ["payload", "encoder", "encode_ms", "bytes", "valid_json", "gzip_ms", "gzip_bytes", "zstd_ms", "zstd_bytes"]
+    print(" | ".join(f"{c:>13}" for c in cols))
+    for r in results:
+        if "error" in r:
+            print(f"{r['payload']:>13} | {r['encoder']:>13} | {r['error']}")
+            continue
+        cells = []
+        for c in cols:
+            v = r.get(c, "-")
+            cells.append(f"{v:>13.2f}" if isinstance(v, float) else f"{str(v):>13}")
+        print(" | ".join(cells))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write results as JSON to this path")
+    args = parser.parse_args(argv)
+
+    results = bench_payload("nl_query_db", nl_query_db_payload(args.rows), args.repeat)
+    results += bench_payload("summarize", summarize_payload(args.rows), args.repeat)
+    _print_table(results)
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump({"rows": args.rows, "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
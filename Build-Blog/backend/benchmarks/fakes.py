@@ -0,0 +1,221 @@
+# benchmarks/fakes.py
+"""Offline stand-ins for GCS, Vertex and Cloud SQL, wired in through the clients' injection hooks."""
+import os
+import re
+import json
+import time
+import random
+import shutil
+import sqlite3
+import tempfile
+import threading
+
+import vertex_ai_client
+import nl_to_sql
+from vertex_ai_client import generate_text_fallback
+
+
+# ------- GCS -------
+class FakeBlob:
+    def __init__(self, store: dict, lock: threading.Lock, key: str):
+        self._store = store
+        self._lock = lock
+        self._key = key
+
+    def upload_from_filename(self, local_path: str):
+        with open(local_path, "rb") as f:
+            data = f.read()
+        with self._lock:
+            self._store[self._key] = data
+
+    def download_to_filename(self, local_path: str):
+        with self._lock:
+            if self._key not in self._store:
+                raise FileNotFoundError(f"gs://{self._key}")
+            data = self._store[self._key]
+        with open(local_path, "wb") as f:
+            f.write(data)
+
+
+class FakeBucket:
+    def __init__(self, client, name: str):
+        self._client = client
+        self.name = name
+
+    def blob(self, blob_name: str) -> FakeBlob:
+        return FakeBlob(self._client.blobs, self._client._lock, f"{self.name}/{blob_name}")
+
+
+class FakeStorageClient:
+    """In-memory GCS: blobs are kept in a dict keyed by 'bucket/blob'."""
+
+    def __init__(self):
+        self.blobs = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, bucket_name: str) -> FakeBucket:
+        return FakeBucket(self, bucket_name)
+
+    def put(self, gcs_path: str, data: bytes):
+        assert gcs_path.startswith("gs://"), "gcs_path must start with gs://"
+        with self._lock:
+            self.blobs[gcs_path[5:]] = data
+
+
+# ------- Vertex -------
+_QUESTION_RE = re.compile(r'User question:\s*"(.*)"', re.S)
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class FakeTextModel:
+    """
+    Answers like a well-behaved model (JSON with rule-based SQL) after `latency_s`.
+    Raises with probability `failure_rate` to exercise the fallback / circuit breaker.
+    """
+
+    def __init__(self, latency_s: float = 0.0, failure_rate: float = 0.0, seed: int = 0):
+        self.latency_s = latency_s
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def predict(self, prompt: str, max_output_tokens: int = 512) -> FakeResponse:
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        if fail:
+            raise RuntimeError("fake Vertex failure")
+        match = _QUESTION_RE.search(prompt)
+        question = match.group(1) if match else prompt
+        return FakeResponse(json.dumps(generate_text_fallback(question)))
+
+
+# ------- Cloud SQL -------
+STUDENT_COLUMNS = [c["name"] for c in nl_to_sql.SCHEMA["columns"]]
+
+MYSQL_DDL = (
+    "CREATE TABLE students (student_id INT, name VARCHAR(64), age INT, department VARCHAR(32), "
+    "attendance_percentage INT, internal_marks INT, external_marks INT)"
+)
+SQLITE_DDL = (
+    "CREATE TABLE students (student_id INTEGER, name TEXT, age INTEGER, department TEXT, "
+    "attendance_percentage INTEGER, internal_marks INTEGER, external_marks INTEGER)"
+)
+
+
+def student_rows(n_rows: int, seed: int = 0) -> list:
+    """Deterministic rows for the students table; every 20th row duplicates its predecessor."""
+    rng = random.Random(seed)
+    departments = ["CSE", "ECE", "MECH", "CIVIL", "IT"]
+    rows = []
+    for i in range(n_rows):
+        if i and i % 20 == 0:
+            rows.append(rows[-1])
+            continue
+        rows.append((
+            i,
+            f"student-{i}",
+            rng.randint(17, 30),
+            rng.choice(departments),
+            rng.randint(40, 100),
+            rng.randint(0, 50),
+            rng.randint(0, 100),
+        ))
+    return rows
+
+
+def seed_students(conn, n_rows: int, ddl: str, placeholder: str):
+    cursor = conn.cursor()
+    try:
+        cursor.execute("DROP TABLE IF EXISTS students")
+        cursor.execute(ddl)
+        marks = ", ".join([placeholder] * len(STUDENT_COLUMNS))
+        cursor.executemany(f"INSERT INTO students ({', '.join(STUDENT_COLUMNS)}) VALUES ({marks})", student_rows(n_rows))
+        conn.commit()
+    finally:
+        cursor.close()
+
+
+def sqlite_connect(path: str):
+    """Returns a connect(db_config) callable for gcp_helpers.set_db_connect backed by a SQLite file."""
+    def connect(db_config):
+        return sqlite3.connect(path, check_same_thread=False)
+    return connect
+
+
+def mysql_connect(host: str, port: int, user: str, password: str, db: str):
+    """Returns a connect(db_config) callable for a local MySQL server (ignores the Cloud SQL config)."""
+    import pymysql
+
+    def connect(db_config):
+        return pymysql.connect(host=host, port=port, user=user, password=password, database=db)
+    return connect
+
+
+def mysql_settings_from_env() -> dict:
+    return {
+        "host": os.getenv("BENCH_MYSQL_HOST", "127.0.0.1"),
+        "port": int(os.getenv("BENCH_MYSQL_PORT", "3306")),
+        "user": os.getenv("BENCH_MYSQL_USER", "root"),
+        "password": os.getenv("BENCH_MYSQL_PASSWORD", ""),
+        "db": os.getenv("BENCH_MYSQL_DB", "bench"),
+    }
+
+
+# ------- wiring -------
+class OfflineEnvironment:
+    """
+    Context manager that installs the fakes into gcp_helpers / vertex_ai_client and
+    restores the real clients on exit.
+
+        with OfflineEnvironment(db="sqlite", n_db_rows=5000) as env:
+            env.storage.put("gs://bucket/file.csv", data)
+    """
+
+    def __init__(self, db: str = "sqlite", n_db_rows: int = 1000, model: FakeTextModel = None):
+        if db not in ("sqlite", "mysql"):
+            raise ValueError(f"Unsupported db stand-in: {db}")
+        self.db = db
+        self.n_db_rows = n_db_rows
+        self.model = model or FakeTextModel()
+        self.storage = FakeStorageClient()
+        self.tmpdir = None
+
+    def __enter__(self):
+        import gcp_helpers  # needs google-cloud libs; keeps FakeTextModel usable without them
+
+        self.tmpdir = tempfile.mkdtemp(prefix="bench-")
+        if self.db == "sqlite":
+            path = os.path.join(self.tmpdir, "students.db")
+            connect = sqlite_connect(path)
+            ddl, placeholder = SQLITE_DDL, "?"
+        else:
+            connect = mysql_connect(**mysql_settings_from_env())
+            ddl, placeholder = MYSQL_DDL, "%s"
+        conn = connect({})
+        try:
+            seed_students(conn, self.n_db_rows, ddl, placeholder)
+        finally:
+            conn.close()
+        gcp_helpers.set_storage_client(self.storage)
+        gcp_helpers.set_db_connect(connect)
+        vertex_ai_client.set_model_factory(lambda model_resource: self.model)
+        nl_to_sql.vertex_breaker.reset()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        import gcp_helpers
+
+        gcp_helpers.set_storage_client(None)
+        gcp_helpers.set_db_connect(None)
+        vertex_ai_client.set_model_factory(None)
+        nl_to_sql.vertex_breaker.reset()
+        shutil.rmtree(self.tmpdir, ignore_errors=True)
+        return False
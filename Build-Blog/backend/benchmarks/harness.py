@@ -0,0 +1,195 @@
+# benchmarks/harness.py
+"""Timing, load generation, result storage and baseline comparison shared by the benchmark suites."""
+import os
+import json
+import math
+import time
+import platform
+import threading
+import tracemalloc
+import subprocess
+from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+
+# metric -> True when lower is better
+COMPARED_METRICS = {
+    "p50_ms": True,
+    "p95_ms": True,
+    "p99_ms": True,
+    "peak_mem_kb": True,
+    "throughput_rps": False,
+}
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def latency_stats(latencies_s: list) -> dict:
+    ms = sorted(x * 1000 for x in latencies_s)
+    return {
+        "n": len(ms),
+        "mean_ms": sum(ms) / len(ms) if ms else float("nan"),
+        "min_ms": ms[0] if ms else float("nan"),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1] if ms else float("nan"),
+    }
+
+
+def peak_memory_kb(fn) -> float:
+    """Peak Python heap growth (tracemalloc) while running fn once."""
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024
+
+
+def bench(suite: str, name: str, fn, repeat: int = 20, warmup: int = 2, params: dict = None) -> dict:
+    """Runs fn `repeat` times after `warmup` calls. Memory is measured in a separate traced call."""
+    for _ in range(warmup):
+        fn()
+    latencies = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t0)
+    result = {"suite": suite, "name": name, "params": params or {}}
+    result.update(latency_stats(latencies))
+    result["peak_mem_kb"] = peak_memory_kb(fn)
+    return result
+
+
+def load_test(suite: str, name: str, make_client, request_fn, total_requests: int = 200,
+              concurrency: int = 8, params: dict = None) -> dict:
+    """
+    Issues `total_requests` calls of request_fn(client) from `concurrency` threads,
+    each with its own client from make_client(). A response counts as an error
+    unless its status_code is 2xx. Reports throughput, latency percentiles and peak memory.
+    """
+    lock = threading.Lock()
+    latencies, errors = [], []
+    remaining = [total_requests]
+
+    def worker():
+        client = make_client()
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+            t0 = time.perf_counter()
+            try:
+                resp = request_fn(client)
+                ok = 200 <= resp.status_code < 300
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors.append(elapsed)
+
+    def run():
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            for future in [pool.submit(worker) for _ in range(concurrency)]:
+                future.result()
+
+    # warm-up + memory pass, then the timed pass
+    remaining[0] = min(total_requests, concurrency * 2)
+    mem_kb = peak_memory_kb(run)
+    latencies.clear()
+    errors.clear()
+    remaining[0] = total_requests
+    t0 = time.perf_counter()
+    run()
+    wall = time.perf_counter() - t0
+
+    result = {"suite": suite, "name": name, "params": dict(params or {}, concurrency=concurrency)}
+    result.update(latency_stats(latencies))
+    result["errors"] = len(errors)
+    result["throughput_rps"] = len(latencies) / wall if wall > 0 else float("nan")
+    result["peak_mem_kb"] = mem_kb
+    return result
+
+
+# ------- results -------
+def _git_rev() -> str:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True).strip()
+    except Exception:
+        return ""
+
+
+def write_results(results: list, path: str, extra_meta: dict = None):
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    meta.update(extra_meta or {})
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2, default=str)
+
+
+def load_results(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(current: list, baseline: list, threshold: float = 0.2) -> list:
+    """
+    Returns human-readable regressions: a metric worse than baseline by more than
+    `threshold` (fraction), more failed requests, or a case that became invalid.
+    Cases missing from either run are ignored.
+    """
+    base = {(r["suite"], r["name"]): r for r in baseline}
+    regressions = []
+    for r in current:
+        b = base.get((r["suite"], r["name"]))
+        if not b:
+            continue
+        if "error" in r and "error" not in b:
+            regressions.append(f"{r['suite']}/{r['name']}: now invalid ({r['error']})")
+            continue
+        if r.get("errors", 0) > b.get("errors", 0):
+            regressions.append(f"{r['suite']}/{r['name']}: errors {b.get('errors', 0)} -> {r['errors']}")
+        for metric, lower_is_better in COMPARED_METRICS.items():
+            new, old = r.get(metric), b.get(metric)
+            if not isinstance(new, (int, float)) or not isinstance(old, (int, float)) or old <= 0:
+                continue
+            change = (new - old) / old if lower_is_better else (old - new) / old
+            if change > threshold:
+                regressions.append(
+                    f"{r['suite']}/{r['name']}: {metric} {old:.2f} -> {new:.2f} ({change:+.0%} worse)"
+                )
+    return regressions
+
+
+def print_results(results: list):
+    cols = ["suite", "name", "n", "p50_ms", "p95_ms", "p99_ms", "throughput_rps", "peak_mem_kb", "errors"]
+    print(" | ".join(f"{c:>14}" if c != "name" else f"{c:<32}" for c in cols))
+    for r in results:
+        if "error" in r:
+            print(f"{r['suite']:>14} | {r['name']:<32} | INVALID: {r['error']}")
+            continue
+        cells = []
+        for c in cols:
+            v = r.get(c, "-")
+            if c == "name":
+                cells.append(f"{str(v):<32}")
+            elif isinstance(v, float):
+                cells.append(f"{v:>14.2f}")
+            else:
+                cells.append(f"{str(v):>14}")
+        print(" | ".join(cells))
@@ -0,0 +1,72 @@
+# benchmarks/run.py
+"""
+Offline benchmark + load-test suite. GCS, Vertex and Cloud SQL are replaced by the
+stand-ins in benchmarks/fakes.py, so no credentials or network are needed.
+
+    cd Build-Blog/backend
+    python -m benchmarks.run --quick
+    python -m benchmarks.run --out benchmarks/results/baseline.json
+    python -m benchmarks.run --baseline benchmarks/results/baseline.json --threshold 0.25
+
+Exits with status 1 when a metric regresses past the threshold or the baseline.
+"""
+import os
+import sys
+import argparse
+from datetime import datetime
+
+from benchmarks import harness
+from benchmarks.fakes import FakeTextModel, OfflineEnvironment
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Offline benchmark and load-test suite")
+    parser.add_argument("--suite", choices=["micro", "endpoint", "all"], default="all")
+    parser.add_argument("--quick", action="store_true", help="smaller inputs and fewer iterations")
+    parser.add_argument("--db", choices=["sqlite", "mysql"], default="sqlite",
+                        help="Cloud SQL stand-in; mysql reads BENCH_MYSQL_HOST/PORT/USER/PASSWORD/DB")
+    parser.add_argument("--db-rows", type=int, default=5000, help="rows seeded into the students table")
+    parser.add_argument("--model-latency", type=float, default=0.0, help="fake Vertex latency in seconds")
+    parser.add_argument("--model-failure-rate", type=float, default=0.0, help="fake Vertex failure probability")
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--requests", type=int, default=None, help="requests per endpoint")
+    parser.add_argument("--out", help="results JSON path (default: benchmarks/results/<timestamp>.json)")
+    parser.add_argument("--baseline", help="results JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed relative regression (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    model = FakeTextModel(latency_s=args.model_latency, failure_rate=args.model_failure_rate)
+    results = []
+    with OfflineEnvironment(db=args.db, n_db_rows=args.db_rows, model=model) as env:
+        if args.suite in ("micro", "all"):
+            from benchmarks import bench_micro
+            results += bench_micro.run(quick=args.quick)
+        if args.suite in ("endpoint", "all"):
+            from benchmarks import bench_endpoints
+            results += bench_endpoints.run(env, quick=args.quick, concurrency=args.concurrency,
+                                           total_requests=args.requests)
+
+    harness.print_results(results)
+
+    out = args.out
+    if not out:
+        out = os.path.join(RESULTS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S") + ".json")
+    harness.write_results(results, out, extra_meta={"args": vars(args)})
+    print(f"\nResults written to {out}")
+
+    if args.baseline:
+        baseline = harness.load_results(args.baseline)["results"]
+        regressions = harness.compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) beyond {args.threshold:.0%}:")
+            for line in regressions:
+                print("  " + line)
+            return 1
+        print(f"\nNo regressions beyond {args.threshold:.0%} against {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
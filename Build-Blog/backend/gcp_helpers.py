@@ -5,10 +5,32 @@ from google.cloud.sql.connector import Connector
 import pymysql
 
 logger = logging.getLogger(__name__)
-storage_client = storage.Client()
+
+# Clients are created lazily and can be swapped (e.g. for offline benchmarks).
+_storage_client = None
+_db_connect = None
+
+def get_storage_client():
+    global _storage_client
+    if _storage_client is None:
+        _storage_client = storage.Client()
+    return _storage_client
+
+def set_storage_client(client):
+    """Use `client` (anything with .bucket(name).blob(name)) for GCS calls; None restores the default."""
+    global _storage_client
+    _storage_client = client
+
+def set_db_connect(connect):
+    """
+    Use `connect(db_config)` to open DB-API connections in run_cloudsql_query
+    (e.g. SQLite or a local MySQL); None restores the Cloud SQL connector.
+    """
+    global _db_connect
+    _db_connect = connect
 
 def upload_file_to_gcs(local_path: str, bucket_name: str, dest_blob_name: str) -> str:
-    bucket = storage_client.bucket(bucket_name)
+    bucket = get_storage_client().bucket(bucket_name)
     blob = bucket.blob(dest_blob_name)
     blob.upload_from_filename(local_path)
     return f"gs://{bucket_name}/{dest_blob_name}"
@@ -18,7 +40,7 @@ def download_blob_to_file(gcs_path: str, local_path: str):
     parts = gcs_path[5:].split("/", 1)
     bucket_name = parts[0]
     blob_name = parts[1] if len(parts) > 1 else ""
-    bucket = storage_client.bucket(bucket_name)
+    bucket = get_storage_client().bucket(bucket_name)
     blob = bucket.blob(blob_name)
     blob.download_to_filename(local_path)
 
@@ -32,18 +54,25 @@ def run_cloudsql_query(sql: str, db_config: dict):
     connector = None
     conn = None
     try:
-        connector = Connector()
-        conn = connector.connect(
-            db_config["instance_connection_name"],
-            "pymysql",
-            user=db_config["user"],
-            password=db_config["password"],
-            db=db_config["db_name"],
-        )
-        with conn.cursor() as cursor:
+        if _db_connect is not None:
+            conn = _db_connect(db_config)
+        else:
+            connector = Connector()
+            conn = connector.connect(
+                db_config["instance_connection_name"],
+                "pymysql",
+                user=db_config["user"],
+                password=db_config["password"],
+                db=db_config["db_name"],
+            )
+        # plain cursor (not a context manager) so sqlite3 connections work too
+        cursor = conn.cursor()
+        try:
             cursor.execute(sql)
             cols = [col[0] for col in cursor.description] if cursor.description else []
             rows = cursor.fetchall()
+        finally:
+            cursor.close()
         return [dict(zip(cols, r)) for r in rows]
     finally:
         try:
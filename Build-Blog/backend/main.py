@@ -1,6 +1,7 @@
 # main.py
 import os
 import json
+import hashlib
 import tempfile
 import logging
 import traceback
@@ -18,9 +19,12 @@ from gcp_helpers import (
 )
 from analysis_utils import summarize_dataframe
 from nl_to_sql import nl_to_sql  # LLM wrapper (uses Vertex)
+from serialization import FastJSONProvider, compress_response
 
 load_dotenv()
 app = Flask(__name__)
+app.json = FastJSONProvider(app)  # orjson-backed, NaN/NaT/Decimal safe
+app.after_request(compress_response)  # gzip/zstd for large JSON bodies
 logging.basicConfig(level=logging.INFO)
 
 PROJECT_ID = os.getenv("PROJECT_ID")
@@ -96,7 +100,9 @@ def upload():
             tmp = tempfile.NamedTemporaryFile(delete=False, suffix=file.filename)
             with open(tmp.name, "wb") as f:
                 f.write(raw)
-            gcs_path = upload_file_to_gcs(tmp.name, BUCKET, file.filename)
+            # content-addressed name: different files called data.csv must not overwrite each other
+            blob_name = f"{hashlib.sha256(raw).hexdigest()[:16]}-{file.filename}"
+            gcs_path = upload_file_to_gcs(tmp.name, BUCKET, blob_name)
         summary, charts = summarize_dataframe(df)
         return jsonify({"summary": summary, "charts": charts, "gcs_path": gcs_path})
     except Exception as e:
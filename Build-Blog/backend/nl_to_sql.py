@@ -2,9 +2,13 @@
 import os
 import json
 import logging
-from typing import Union
+import threading
+from functools import partial
+from concurrent.futures import TimeoutError as FutureTimeout
+from typing import Optional, Union
 
-from vertex_ai_client import generate_text_from_vertex, generate_text_fallback
+from vertex_ai_client import generate_text_from_vertex, generate_text_fallback, fallback_intent
+from resilience import CircuitBreaker, submit
 
 # Use the schema you provided. Update if schema changes.
 SCHEMA = {
@@ -24,6 +28,17 @@ MODEL_RESOURCE = os.getenv("MODEL_RESOURCE", "models/2.5-flash")  # default to 2
 PROJECT_ID = os.getenv("PROJECT_ID")
 REGION = os.getenv("REGION")
 
+# Resilience settings for the Vertex path
+VERTEX_TIMEOUT_S = float(os.getenv("VERTEX_TIMEOUT_S", "15"))  # total budget incl. the retry
+VERTEX_CB_FAILURES = int(os.getenv("VERTEX_CB_FAILURES", "3"))
+VERTEX_CB_COOLDOWN_S = float(os.getenv("VERTEX_CB_COOLDOWN_S", "60"))
+# Hedged mode: for questions the rule-based generator understands, answer with it
+# if Vertex has not replied within NL_SQL_HEDGE_DELAY_S.
+NL_SQL_HEDGED = os.getenv("NL_SQL_HEDGED", "false").lower() in ("1", "true", "yes")
+NL_SQL_HEDGE_DELAY_S = float(os.getenv("NL_SQL_HEDGE_DELAY_S", "0.5"))
+
+vertex_breaker = CircuitBreaker(VERTEX_CB_FAILURES, VERTEX_CB_COOLDOWN_S, name="vertex")
+
 # Strong instruction: output JSON only
 PROMPT = """
 You are an expert SQL generator for MySQL 8 (Cloud SQL). Use this schema:
@@ -59,37 +74,122 @@ def _format_schema() -> str:
         lines.append(f"- {c['name']} ({c['type']})")
     return "\n".join(lines)
 
-def nl_to_sql(question: str) -> Union[str, dict]:
-    prompt = PROMPT.format(table=SCHEMA["table"], columns=_format_schema(), question=question)
+def _parse_sql_json(resp: str) -> Optional[dict]:
+    # model should return JSON string. Try parse.
+    try:
+        parsed = json.loads(resp)
+        if isinstance(parsed, dict) and parsed.get("sql"):
+            return parsed
+        return None
+    except Exception:
+        pass
+    # try to strip surrounding text and find JSON object
     try:
-        resp = generate_text_from_vertex(prompt, MODEL_RESOURCE, PROJECT_ID, REGION)
-        # model should return JSON string. Try parse.
-        try:
-            parsed = json.loads(resp)
+        start = resp.find("{")
+        end = resp.rfind("}")
+        if start != -1 and end != -1:
+            parsed = json.loads(resp[start:end+1])
             if isinstance(parsed, dict) and parsed.get("sql"):
                 return parsed
-            # if parsed is not dict, fallback to retry
-        except Exception:
-            # try to strip surrounding text and find JSON object
+    except Exception:
+        pass
+    return None
+
+def _vertex_sql(question: str) -> Optional[dict]:
+    """
+    Asks Vertex for SQL, retrying once with a stricter prompt if the reply is not usable JSON.
+    Returns None when both replies are unusable; raises if Vertex itself fails.
+    """
+    fmt = dict(table=SCHEMA["table"], columns=_format_schema(), question=question)
+    parsed = _parse_sql_json(generate_text_from_vertex(PROMPT.format(**fmt), MODEL_RESOURCE, PROJECT_ID, REGION))
+    if parsed:
+        return parsed
+    # Retry once with stricter instruction
+    return _parse_sql_json(generate_text_from_vertex(RETRY_PROMPT.format(**fmt), MODEL_RESOURCE, PROJECT_ID, REGION))
+
+def _succeeded(future) -> bool:
+    # an unusable reply costs two round-trips just like an error, so it counts as a failure
+    return not future.cancelled() and future.exception() is None and bool(future.result())
+
+def _record_outcome(breaker, future):
+    if _succeeded(future):
+        breaker.record_success()
+    else:
+        breaker.record_failure()
+
+def _record_late_success(breaker, future):
+    # the timeout was already counted as a failure; only a late answer changes the picture
+    if _succeeded(future):
+        breaker.record_success()
+
+def _watch_hedged(breaker, future, remaining_s: float):
+    """
+    Keeps the deadline for a hedged call that is still running: a failure is recorded once
+    `remaining_s` passes (so a hung half-open trial cannot pin the breaker), after which
+    only a late success counts; if the call finishes first its outcome is recorded.
+    """
+    lock = threading.Lock()
+    state = {"settled": False, "timed_out": False}
+
+    def on_deadline():
+        with lock:
+            if state["settled"]:
+                return
+            state["timed_out"] = True
+        breaker.record_failure()
+        logging.warning("Hedged Vertex call did not answer within %.1fs", VERTEX_TIMEOUT_S)
+
+    def on_done(f):
+        timer.cancel()
+        with lock:
+            state["settled"] = True
+            timed_out = state["timed_out"]
+        if timed_out:
+            _record_late_success(breaker, f)
+        else:
+            _record_outcome(breaker, f)
+
+    timer = threading.Timer(max(0.0, remaining_s), on_deadline)
+    timer.daemon = True
+    timer.start()
+    future.add_done_callback(on_done)
+
+def nl_to_sql(question: str) -> Union[str, dict]:
+    breaker = vertex_breaker
+    if not breaker.allow():
+        logging.warning("Vertex circuit open; using rule-based SQL")
+        return generate_text_fallback(question)
+
+    future = submit(_vertex_sql, question)
+    try:
+        if NL_SQL_HEDGED and fallback_intent(question):
+            hedge_s = min(NL_SQL_HEDGE_DELAY_S, VERTEX_TIMEOUT_S)
             try:
-                start = resp.find("{")
-                end = resp.rfind("}")
-                if start != -1 and end != -1:
-                    candidate = resp[start:end+1]
-                    parsed = json.loads(candidate)
-                    if isinstance(parsed, dict) and parsed.get("sql"):
-                        return parsed
-            except Exception:
-                pass
-        # Retry once with stricter instruction
-        resp2 = generate_text_from_vertex(RETRY_PROMPT.format(table=SCHEMA["table"], columns=_format_schema(), question=question), MODEL_RESOURCE, PROJECT_ID, REGION)
-        try:
-            parsed2 = json.loads(resp2)
-            if isinstance(parsed2, dict) and parsed2.get("sql"):
-                return parsed2
-        except Exception:
-            pass
+                parsed = future.result(timeout=hedge_s)
+            except FutureTimeout:
+                # Known intent: serve the rule-based answer now. A call still waiting
+                # for a worker is dropped; one already running keeps its deadline.
+                if future.cancel():
+                    breaker.record_failure()
+                else:
+                    _watch_hedged(breaker, future, VERTEX_TIMEOUT_S - hedge_s)
+                logging.info("Vertex slower than %.2fs; hedged to rule-based SQL", NL_SQL_HEDGE_DELAY_S)
+                return generate_text_fallback(question)
+        else:
+            parsed = future.result(timeout=VERTEX_TIMEOUT_S)
+        if parsed:
+            breaker.record_success()
+            return parsed
+        breaker.record_failure()
+        logging.warning("Vertex returned no usable SQL JSON")
+    except FutureTimeout:
+        breaker.record_failure()
+        # don't spend Vertex quota on a call nobody is waiting for
+        if not future.cancel():
+            future.add_done_callback(partial(_record_late_success, breaker))
+        logging.warning("Vertex did not answer within %.1fs", VERTEX_TIMEOUT_S)
     except Exception as e:
+        breaker.record_failure()
         logging.exception("Vertex failed: %s", e)
 
     # Final fallback: rule-based generator
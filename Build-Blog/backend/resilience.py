@@ -0,0 +1,92 @@
+# resilience.py
+import os
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Shared pool for slow upstream calls (Vertex). Threads cannot be killed, so a
+# hung call keeps its worker until it returns; the caller just stops waiting.
+_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv("LLM_MAX_WORKERS", "4")),
+    thread_name_prefix="llm-call",
+)
+
+
+class CircuitBreaker:
+    """
+    Minimal thread-safe circuit breaker.
+    closed -> open after `failure_threshold` consecutive failures.
+    open -> half_open once `cooldown_s` has elapsed; a single trial call is let through.
+    half_open -> closed on success, back to open on failure.
+    """
+
+    def __init__(self, failure_threshold: int = 3, cooldown_s: float = 60.0,
+                 name: str = "breaker", clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = max(1, int(failure_threshold))
+        self.cooldown_s = float(cooldown_s)
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == OPEN and self._clock() - self._opened_at >= self.cooldown_s:
+                return HALF_OPEN
+            return self._state
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                if self._clock() - self._opened_at < self.cooldown_s:
+                    return False
+                self._state = HALF_OPEN
+                self._trial_in_flight = False
+            # half-open: only one trial call at a time
+            if self._trial_in_flight:
+                return False
+            self._trial_in_flight = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            if self._state != CLOSED:
+                logger.info("Circuit %s closed", self.name)
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    logger.warning("Circuit %s opened after %d failure(s)", self.name, self._failures)
+                self._state = OPEN
+                self._opened_at = self._clock()
+
+    def reset(self):
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+
+def submit(fn: Callable, *args, **kwargs):
+    """Run fn on the shared worker pool and return its Future."""
+    return _executor.submit(fn, *args, **kwargs)
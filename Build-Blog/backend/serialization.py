@@ -0,0 +1,187 @@
+# serialization.py
+import os
+import gzip
+import json
+import math
+import logging
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+from flask import request
+from flask.json.provider import JSONProvider
+
+try:
+    import orjson
+except Exception:  # optional: falls back to the stdlib encoder
+    orjson = None
+
+try:
+    import zstandard
+except Exception:  # optional: only gzip is offered without it
+    zstandard = None
+
+logger = logging.getLogger(__name__)
+
+JSON_ENCODER = os.getenv("JSON_ENCODER", "orjson" if orjson else "stdlib")
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "5"))
+ZSTD_LEVEL = int(os.getenv("ZSTD_LEVEL", "3"))
+
+
+# ------- value conversion -------
+def _default(obj):
+    """Converts values neither encoder handles natively. NaN/NaT/inf become None; datetimes are ISO-8601."""
+    if isinstance(obj, Decimal):
+        # exact text, as Flask's default provider sent it (pymysql DECIMAL / SUM / AVG)
+        return str(obj) if obj.is_finite() else None
+    if isinstance(obj, (datetime, date, time)):
+        # covers pd.Timestamp and pd.NaT (both datetime subclasses)
+        return None if obj is pd.NaT else obj.isoformat()
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, np.datetime64):
+        # same text as orjson's native OPT_SERIALIZE_NUMPY output (microsecond isoformat)
+        return None if np.isnat(obj) else pd.Timestamp(obj).to_pydatetime(warn=False).isoformat()
+    if isinstance(obj, np.generic):
+        return _scrub(obj.item())
+    if isinstance(obj, np.ndarray):
+        return _scrub(obj.tolist())
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, (bytes, bytearray)):
+        return obj.decode("utf-8", errors="replace")
+    if obj is pd.NA or obj is pd.NaT:
+        return None
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _key(k):
+    if isinstance(k, str):
+        return k
+    if k is None or (isinstance(k, float) and math.isnan(k)) or k is pd.NaT:
+        return "null"
+    if isinstance(k, (datetime, date, time)):
+        return k.isoformat()
+    return str(k)
+
+
+def _scrub(obj):
+    """Recursively makes obj strict-JSON safe: str keys, NaN/inf -> None, exotic scalars converted."""
+    if isinstance(obj, dict):
+        return {_key(k): _scrub(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_scrub(v) for v in obj]
+    if isinstance(obj, float):
+        return obj if math.isfinite(obj) else None
+    if obj is None or isinstance(obj, (str, int, bool)):
+        return obj
+    return _default(obj)
+
+
+# ------- encoders -------
+def _encode_orjson(obj) -> bytes:
+    try:
+        return orjson.dumps(obj, default=_default, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    except TypeError:
+        pass  # e.g. Timestamp/tuple dict keys that orjson refuses
+    try:
+        return orjson.dumps(_scrub(obj), default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    except TypeError:
+        # e.g. ints beyond 64 bits (BIGINT UNSIGNED, computed columns), which only the stdlib handles
+        return _encode_stdlib(obj)
+
+
+def _encode_stdlib(obj) -> bytes:
+    return json.dumps(_scrub(obj), default=_default, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+ENCODERS: Dict[str, Callable[[object], bytes]] = {"stdlib": _encode_stdlib}
+if orjson is not None:
+    ENCODERS["orjson"] = _encode_orjson
+
+
+def get_encoder(name: Optional[str] = None) -> Callable[[object], bytes]:
+    name = name or JSON_ENCODER
+    if name not in ENCODERS:
+        logger.warning("JSON encoder %r not available, using stdlib", name)
+        return _encode_stdlib
+    return ENCODERS[name]
+
+
+class FastJSONProvider(JSONProvider):
+    """Flask JSON provider backed by the configured encoder; keeps jsonify() call sites unchanged."""
+
+    mimetype = "application/json"
+
+    def __init__(self, app, encoder: Optional[str] = None):
+        super().__init__(app)
+        self._encode = get_encoder(encoder)
+
+    def dumps(self, obj, **kwargs) -> str:
+        return self._encode(obj).decode("utf-8")
+
+    def loads(self, s, **kwargs):
+        if orjson is not None:
+            try:
+                return orjson.loads(s)
+            except orjson.JSONDecodeError:
+                pass  # e.g. NaN literals, which only the stdlib parser accepts
+        return json.loads(s, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj), mimetype=self.mimetype)
+
+
+# ------- compression -------
+def compress(data: bytes, encoding: str) -> bytes:
+    if encoding == "zstd":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(data)
+    if encoding == "gzip":
+        return gzip.compress(data, compresslevel=GZIP_LEVEL)
+    raise ValueError(f"Unsupported encoding: {encoding}")
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Picks zstd or gzip from an Accept-Encoding header, honouring q=0."""
+    offered = {}
+    for part in (accept_encoding or "").split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        if token:
+            offered[token.lower()] = q
+    if zstandard is not None and offered.get("zstd", 0) > 0:
+        return "zstd"
+    if offered.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress_response(response):
+    """after_request hook: compresses JSON bodies above COMPRESS_MIN_BYTES when the client accepts it."""
+    if (
+        response.direct_passthrough
+        or response.status_code < 200
+        or "Content-Encoding" in response.headers
+        or response.mimetype != "application/json"
+    ):
+        return response
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
+    response.vary.add("Accept-Encoding")
+    encoding = choose_encoding(request.headers.get("Accept-Encoding", ""))
+    if not encoding:
+        return response
+    response.set_data(compress(data, encoding))
+    response.headers["Content-Encoding"] = encoding
+    return response
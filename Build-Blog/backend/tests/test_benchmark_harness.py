@@ -0,0 +1,67 @@
+import math
+
+from benchmarks.harness import compare, latency_stats, percentile
+
+
+def _case(name="case", suite="endpoint", **metrics):
+    return dict({"suite": suite, "name": name}, **metrics)
+
+
+def test_percentile_nearest_rank():
+    values = list(range(1, 101))
+    assert percentile(values, 50) == 50
+    assert percentile(values, 95) == 95
+    assert percentile(values, 99) == 99
+    assert percentile(values, 100) == 100
+    assert percentile(values, 0) == 1
+    assert percentile([7.0], 99) == 7.0
+    assert math.isnan(percentile([], 50))
+
+
+def test_latency_stats_in_ms():
+    stats = latency_stats([0.003, 0.001, 0.002])
+    assert stats["n"] == 3
+    assert math.isclose(stats["min_ms"], 1.0) and math.isclose(stats["max_ms"], 3.0)
+    assert math.isclose(stats["p50_ms"], 2.0)
+    assert math.isclose(stats["mean_ms"], 2.0)
+
+
+def test_lower_is_better_regression():
+    assert compare([_case(p95_ms=13.0)], [_case(p95_ms=10.0)], 0.2)
+    assert compare([_case(p95_ms=5.0)], [_case(p95_ms=10.0)], 0.2) == []
+
+
+def test_higher_is_better_regression():
+    assert compare([_case(throughput_rps=70.0)], [_case(throughput_rps=100.0)], 0.2)
+    assert compare([_case(throughput_rps=200.0)], [_case(throughput_rps=100.0)], 0.2) == []
+
+
+def test_threshold_boundary_is_not_a_regression():
+    assert compare([_case(p50_ms=12.5)], [_case(p50_ms=10.0)], 0.25) == []  # exactly +25%
+    assert compare([_case(throughput_rps=75.0)], [_case(throughput_rps=100.0)], 0.25) == []
+    assert compare([_case(p50_ms=12.6)], [_case(p50_ms=10.0)], 0.25)
+    assert compare([_case(throughput_rps=74.0)], [_case(throughput_rps=100.0)], 0.25)
+
+
+def test_missing_cases_and_metrics_ignored():
+    assert compare([_case("new", p50_ms=100.0)], [_case("old", p50_ms=1.0)], 0.2) == []
+    assert compare([_case(p50_ms=100.0)], [_case(p95_ms=1.0)], 0.2) == []
+    # same name in another suite is a different case
+    assert compare([_case(suite="micro", p50_ms=100.0)], [_case(p50_ms=1.0)], 0.2) == []
+
+
+def test_non_positive_baseline_ignored():
+    assert compare([_case(peak_mem_kb=500.0)], [_case(peak_mem_kb=0.0)], 0.2) == []
+    assert compare([_case(p50_ms=5.0)], [_case(p50_ms=-1.0)], 0.2) == []
+
+
+def test_more_errors_is_a_regression():
+    regressions = compare([_case(errors=2, p50_ms=10.0)], [_case(errors=0, p50_ms=10.0)], 0.2)
+    assert regressions == ["endpoint/case: errors 0 -> 2"]
+    assert compare([_case(errors=0)], [_case(errors=2)], 0.2) == []
+
+
+def test_case_that_became_invalid_is_a_regression():
+    current = [_case(error="load_df_any returned shape (0, 4000), expected (2000, 8)")]
+    assert compare(current, [_case(p50_ms=3.0)], 0.2)
+    assert compare(current, [dict(current[0])], 0.2) == []
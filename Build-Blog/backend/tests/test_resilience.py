@@ -0,0 +1,262 @@
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import nl_to_sql
+import resilience
+import vertex_ai_client
+from resilience import CircuitBreaker, CLOSED, OPEN, HALF_OPEN
+from vertex_ai_client import generate_text_fallback
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeModel:
+    """
+    Stand-in for the Vertex text model. With block=True every predict() waits until
+    release() is called, which makes "slow" and "hung" calls deterministic.
+    """
+
+    def __init__(self, fail=False, reply='{"sql": "SELECT 1;"}', block=False):
+        self.fail = fail
+        self.reply = reply
+        self.calls = 0
+        self.pending = 0
+        self._released = threading.Event()
+        if not block:
+            self._released.set()
+        self._lock = threading.Lock()
+
+    def release(self):
+        self._released.set()
+
+    def predict(self, prompt, max_output_tokens=512):
+        with self._lock:
+            self.calls += 1
+            self.pending += 1
+        try:
+            self._released.wait()
+            if self.fail:
+                raise RuntimeError("fake Vertex failure")
+            return FakeResponse(self.reply)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def breaker(clock, monkeypatch):
+    b = CircuitBreaker(failure_threshold=3, cooldown_s=60, name="test", clock=clock)
+    monkeypatch.setattr(nl_to_sql, "vertex_breaker", b)
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGED", False)
+    monkeypatch.setattr(nl_to_sql, "VERTEX_TIMEOUT_S", 5.0)
+    return b
+
+
+@pytest.fixture
+def install_model():
+    models = []
+
+    def install(model):
+        models.append(model)
+        vertex_ai_client.set_model_factory(lambda model_resource: model)
+        return model
+
+    yield install
+    for m in models:
+        m.release()
+    _wait_for(lambda: not any(m.pending for m in models), timeout=10)
+    vertex_ai_client.set_model_factory(None)
+
+
+def _wait_for(predicate, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached in time"
+        time.sleep(0.005)
+
+
+# ------- CircuitBreaker -------
+def test_breaker_opens_after_threshold(breaker):
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+
+
+def test_breaker_success_resets_failure_count(breaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_breaker_half_open_allows_single_trial(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(59)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_failed_trial_reopens_for_full_cooldown(breaker, clock):
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(60)
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    clock.advance(59)
+    assert not breaker.allow()
+    clock.advance(1)
+    assert breaker.allow()
+
+
+# ------- nl_to_sql -------
+def test_circuit_opens_and_skips_vertex_during_cooldown(breaker, clock, install_model):
+    model = install_model(FakeModel(fail=True))
+    for _ in range(3):
+        assert nl_to_sql.nl_to_sql("average age") == generate_text_fallback("average age")
+    assert model.calls == 3
+    assert breaker.state == OPEN
+
+    for _ in range(5):
+        assert nl_to_sql.nl_to_sql("average age") == generate_text_fallback("average age")
+    assert model.calls == 3
+
+    clock.advance(60)
+    nl_to_sql.nl_to_sql("average age")
+    assert model.calls == 4
+    assert breaker.state == OPEN
+
+
+def test_unusable_replies_open_the_circuit(breaker, install_model):
+    model = install_model(FakeModel(reply="sorry, no JSON today"))
+    for _ in range(3):
+        assert nl_to_sql.nl_to_sql("average age") == generate_text_fallback("average age")
+    assert model.calls == 6  # first prompt + stricter retry each time
+    assert breaker.state == OPEN
+    nl_to_sql.nl_to_sql("average age")
+    assert model.calls == 6
+
+
+def test_usable_reply_is_returned_and_closes(breaker, install_model):
+    install_model(FakeModel(reply=json.dumps({"sql": "SELECT 2;"})))
+    breaker.record_failure()
+    assert nl_to_sql.nl_to_sql("anything") == {"sql": "SELECT 2;"}
+    assert breaker._failures == 0
+
+
+def test_half_open_lets_only_one_call_through(breaker, clock, install_model):
+    model = install_model(FakeModel(block=True))
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(60)
+
+    trial = threading.Thread(target=nl_to_sql.nl_to_sql, args=("average age",))
+    trial.start()
+    _wait_for(lambda: model.calls == 1)
+    # answered from the fallback while the trial is still blocked in Vertex
+    assert nl_to_sql.nl_to_sql("average age") == generate_text_fallback("average age")
+    assert model.pending == 1
+    model.release()
+    trial.join(timeout=10)
+    assert model.calls == 1
+    assert breaker.state == CLOSED
+
+
+def test_hedged_known_intent_answers_before_vertex(breaker, install_model, monkeypatch):
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGED", True)
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGE_DELAY_S", 0.05)
+    model = install_model(FakeModel(block=True))
+
+    result = nl_to_sql.nl_to_sql("average age")
+    assert result == generate_text_fallback("average age")
+    # returned while the Vertex call is still in flight, well before the 5s deadline
+    assert model.pending == 1
+    assert breaker.state == CLOSED and breaker._failures == 0
+
+
+def test_hedged_hung_half_open_trial_reopens_at_deadline(breaker, clock, install_model, monkeypatch):
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGED", True)
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGE_DELAY_S", 0.01)
+    monkeypatch.setattr(nl_to_sql, "VERTEX_TIMEOUT_S", 0.2)
+    model = install_model(FakeModel(block=True))
+    for _ in range(3):
+        breaker.record_failure()
+    clock.advance(60)
+
+    assert nl_to_sql.nl_to_sql("average age") == generate_text_fallback("average age")
+    assert model.pending == 1
+    # the trial never returns, but its deadline re-opens the circuit ...
+    _wait_for(lambda: breaker._state == OPEN)
+    assert model.pending == 1
+    # ... so Vertex is tried again after the next cool-down
+    clock.advance(60)
+    assert breaker.allow()
+    breaker.record_failure()
+
+    # a late success still closes it
+    model.release()
+    _wait_for(lambda: breaker.state == CLOSED)
+
+
+def test_unknown_intent_waits_full_timeout(breaker, install_model, monkeypatch):
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGED", True)
+    monkeypatch.setattr(nl_to_sql, "NL_SQL_HEDGE_DELAY_S", 0.01)
+    monkeypatch.setattr(nl_to_sql, "VERTEX_TIMEOUT_S", 0.3)
+    model = install_model(FakeModel(block=True))
+    question = "list the students by name"
+    assert vertex_ai_client.fallback_intent(question) is None
+
+    t0 = time.monotonic()
+    result = nl_to_sql.nl_to_sql(question)
+    assert time.monotonic() - t0 >= 0.3
+    assert result == generate_text_fallback(question)
+    assert model.pending == 1
+    assert breaker._failures == 1
+
+
+def test_timed_out_queued_call_is_cancelled(breaker, install_model, monkeypatch):
+    pool = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(resilience, "_executor", pool)
+    monkeypatch.setattr(nl_to_sql, "VERTEX_TIMEOUT_S", 0.1)
+    model = install_model(FakeModel(block=True))
+
+    nl_to_sql.nl_to_sql("average age")  # occupies the only worker past its deadline
+    nl_to_sql.nl_to_sql("average age")  # queued behind it, times out, must never run
+    model.release()
+    pool.shutdown(wait=True)
+    assert model.calls == 1
@@ -0,0 +1,138 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("flask")
+
+import serialization
+
+
+@pytest.fixture(params=sorted(serialization.ENCODERS))
+def encode(request):
+    return serialization.ENCODERS[request.param]
+
+
+def test_nan_nat_decimal(encode):
+    payload = {"a": float("nan"), "b": np.float64("inf"), "c": pd.NaT, "d": Decimal("1.50"), "e": np.int64(3)}
+    assert json.loads(encode(payload)) == {"a": None, "b": None, "c": None, "d": "1.50", "e": 3}
+
+
+def test_decimal_keeps_full_precision(encode):
+    assert json.loads(encode({"total": Decimal("12345678901234567.89")})) == {"total": "12345678901234567.89"}
+
+
+def test_int_beyond_64_bits(encode):
+    assert json.loads(encode({"big": 2 ** 70})) == {"big": 2 ** 70}
+
+
+def test_datetime64_same_text_for_all_encoders():
+    values = [np.datetime64("2024-01-01"), np.datetime64("2024-01-01T10:30:00.123456789")]
+    outputs = {name: json.loads(enc(values)) for name, enc in serialization.ENCODERS.items()}
+    assert outputs["stdlib"] == ["2024-01-01T00:00:00", "2024-01-01T10:30:00.123456"]
+    assert len({json.dumps(v) for v in outputs.values()}) == 1
+
+
+# ------- negotiation / compression -------
+def test_choose_encoding():
+    assert serialization.choose_encoding("") is None
+    assert serialization.choose_encoding("gzip, deflate") == "gzip"
+    assert serialization.choose_encoding("gzip;q=0, deflate") is None
+    assert serialization.choose_encoding("GZIP; q=0.5") == "gzip"
+    assert serialization.choose_encoding("br") is None
+    expected = "zstd" if serialization.zstandard is not None else "gzip"
+    assert serialization.choose_encoding("gzip, zstd") == expected
+    assert serialization.choose_encoding("zstd;q=0, gzip") == "gzip"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    import gzip
+    from flask import Flask, Response, jsonify, request
+
+    monkeypatch.setattr(serialization, "COMPRESS_MIN_BYTES", 1024)
+    app = Flask(__name__)
+    app.json = serialization.FastJSONProvider(app)
+    app.after_request(serialization.compress_response)
+    big = {"rows": [{"id": i, "value": float("nan")} for i in range(500)]}
+
+    @app.route("/big")
+    def big_json():
+        return jsonify(big)
+
+    @app.route("/small")
+    def small_json():
+        return jsonify({"status": "ok"})
+
+    @app.route("/text")
+    def text():
+        return Response("x" * 5000, mimetype="text/plain")
+
+    @app.route("/encoded")
+    def encoded():
+        resp = Response(gzip.compress(b'{"a": 1}' * 1000), mimetype="application/json")
+        resp.headers["Content-Encoding"] = "gzip"
+        return resp
+
+    @app.route("/echo", methods=["POST"])
+    def echo():
+        return jsonify(request.get_json())
+
+    return app.test_client()
+
+
+def test_large_json_is_gzipped(client):
+    import gzip
+
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in resp.headers["Vary"]
+    body = gzip.decompress(resp.get_data())
+    assert int(resp.headers["Content-Length"]) == len(resp.get_data()) < len(body)
+    assert json.loads(body)["rows"][0] == {"id": 0, "value": None}
+
+
+def test_large_json_not_compressed_without_accept(client):
+    for headers in ({}, {"Accept-Encoding": "gzip;q=0"}):
+        resp = client.get("/big", headers=headers)
+        assert "Content-Encoding" not in resp.headers
+        assert "Accept-Encoding" in resp.headers["Vary"]
+        assert len(json.loads(resp.get_data())["rows"]) == 500
+
+
+def test_small_json_below_threshold_untouched(client):
+    resp = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert "Vary" not in resp.headers
+    assert resp.get_json() == {"status": "ok"}
+
+
+def test_non_json_and_already_encoded_untouched(client):
+    resp = client.get("/text", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in resp.headers
+    assert resp.get_data() == b"x" * 5000
+
+    import gzip
+    resp = client.get("/encoded", headers={"Accept-Encoding": "gzip"})
+    assert resp.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(resp.get_data()) == b'{"a": 1}' * 1000
+
+
+@pytest.mark.skipif(serialization.zstandard is None, reason="zstandard not installed")
+def test_zstd_preferred_when_offered(client):
+    resp = client.get("/big", headers={"Accept-Encoding": "gzip, zstd"})
+    assert resp.headers["Content-Encoding"] == "zstd"
+    body = serialization.zstandard.ZstdDecompressor().decompressobj().decompress(resp.get_data())
+    assert len(json.loads(body)["rows"]) == 500
+
+
+def test_provider_round_trip_and_bad_json(client):
+    resp = client.post("/echo", json={"a": [1, 2], "b": None})
+    assert resp.status_code == 200
+    assert resp.mimetype == "application/json"
+    assert resp.get_json() == {"a": [1, 2], "b": None}
+
+    resp = client.post("/echo", data="{not json", content_type="application/json")
+    assert resp.status_code == 400
@@ -7,12 +7,33 @@ MODEL_RESOURCE_DEFAULT = os.getenv("MODEL_RESOURCE", "models/2.5-flash")
 PROJECT_ID = os.getenv("PROJECT_ID")
 REGION = os.getenv("REGION")
 
+# Optional stand-in for TextGenerationModel.from_pretrained (e.g. a fake model for offline benchmarks)
+_model_factory = None
+
+def set_model_factory(factory):
+    """
+    factory(model_resource) must return an object with predict(prompt, max_output_tokens=...).
+    None restores the Vertex AI client.
+    """
+    global _model_factory
+    _model_factory = factory
+
+def _response_text(response) -> str:
+    # response can be an object or a string
+    if hasattr(response, "text"):
+        return response.text
+    return str(response)
+
 # primary function to call vertex text generation
 def generate_text_from_vertex(prompt: str, model_resource: Optional[str], project_id: str, region: str) -> str:
     """
     Calls Vertex AI Text Generation. Returns the model's raw text output.
     Raises if Vertex is not configured or call fails.
     """
+    if _model_factory is not None:
+        model = _model_factory(model_resource or MODEL_RESOURCE_DEFAULT)
+        return _response_text(model.predict(prompt, max_output_tokens=512))
+
     try:
         from google.cloud import aiplatform
     except Exception as e:
@@ -28,25 +49,38 @@ def generate_text_from_vertex(prompt: str, model_resource: Optional[str], projec
         model = aiplatform.TextGenerationModel.from_pretrained(model_resource)
         # Use a reasonably small token limit for SQL tasks
         response = model.predict(prompt, max_output_tokens=512)
-        # response can be an object or a string
-        if hasattr(response, "text"):
-            return response.text
-        return str(response)
+        return _response_text(response)
     except Exception as e:
         logging.exception("Vertex predict failed")
         raise
 
+# keyword -> intent table used by the rule-based generator
+FALLBACK_INTENTS = {
+    "duplicates": ("duplicate", "duplicates"),
+    "average": ("average", "avg"),
+    "summary": ("summary", "overview"),
+}
+
+def fallback_intent(question: str) -> Optional[str]:
+    """Returns the rule-based intent matched by the question, or None if only the sample fallback applies."""
+    q = question.lower()
+    for intent, keywords in FALLBACK_INTENTS.items():
+        if any(k in q for k in keywords):
+            return intent
+    return None
+
 # fallback simple rule-based generator (keeps same shape as generate_text_fallback)
 def generate_text_fallback(question: str) -> dict:
     # simple rule-based JSON-like return to match nl_to_sql expected shape
     q = question.lower()
-    if "duplicate" in q or "duplicates" in q:
+    intent = fallback_intent(question)
+    if intent == "duplicates":
         sql = (
             "SELECT student_id, name, age, department, attendance_percentage, internal_marks, external_marks, COUNT(*) AS duplicate_count "
             "FROM students GROUP BY student_id, name, age, department, attendance_percentage, internal_marks, external_marks HAVING COUNT(*) > 1;"
         )
         return {"sql": sql, "explain": "Find rows that are identical across all non-primary columns."}
-    if "average" in q or "avg" in q:
+    if intent == "average":
         if "age" in q:
             col = "age"
         elif "external" in q:
@@ -54,7 +88,7 @@ def generate_text_fallback(question: str) -> dict:
         else:
             col = "external_marks"
         return {"sql": f"SELECT AVG({col}) AS avg_{col} FROM students;", "explain": f"Average of {col}."}
-    if "summary" in q or "overview" in q:
+    if intent == "summary":
         sql = (
             "SELECT COUNT(*) AS total_rows, "
             "AVG(age) AS avg_age, AVG(attendance_percentage) AS avg_attendance, "
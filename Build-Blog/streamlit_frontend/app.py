@@ -1,7 +1,11 @@
+import io
+import json
+import hashlib
+
 import streamlit as st
 import requests
-import json
 import pandas as pd
+from requests.adapters import HTTPAdapter
 
 # ---------------------------------------------------------
 # HARD-CODE YOUR BACKEND URL
@@ -12,13 +16,30 @@ BACKEND = ""
 # ---------------------------------------------------------
 # Helpers
 # ---------------------------------------------------------
+@st.cache_resource
+def get_session() -> requests.Session:
+    # One pooled keep-alive session per server process, shared by all browser sessions
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"Accept-Encoding": "gzip, deflate"})
+    return session
+
+
+def _error_text(e: Exception) -> str:
+    if isinstance(e, requests.HTTPError) and e.response is not None:
+        return f"{e.response.status_code}: {e.response.text}"
+    return str(e)
+
+
 def api_post(endpoint: str, data=None, files=None):
     url = BACKEND + endpoint
     try:
         if files:
-            resp = requests.post(url, files=files)
+            resp = get_session().post(url, files=files)
         else:
-            resp = requests.post(url, json=data)
+            resp = get_session().post(url, json=data)
 
         if resp.status_code != 200:
             return None, f"{resp.status_code}: {resp.text}"
@@ -27,6 +48,54 @@ def api_post(endpoint: str, data=None, files=None):
         return None, str(e)
 
 
+# Cached calls raise on failure so that errors are never cached.
+@st.cache_data(ttl=600, max_entries=256, show_spinner=False)
+def _cached_post(endpoint: str, cache_key: str, _payload: dict):
+    resp = get_session().post(BACKEND + endpoint, json=_payload)
+    resp.raise_for_status()
+    return resp.json()
+
+
+def cached_api_post(endpoint: str, data: dict, file_digest: str = ""):
+    # Row payloads are identified by the uploaded file's digest instead of being hashed
+    key_fields = {k: v for k, v in data.items() if k != "data"}
+    cache_key = file_digest + json.dumps(key_fields, sort_keys=True, default=str)
+    try:
+        return _cached_post(endpoint, cache_key, data), None
+    except Exception as e:
+        return None, _error_text(e)
+
+
+# Not cached: uploading is a side effect. The file_digest check below already
+# uploads each file once per browser session.
+def upload_file(name: str, raw: bytes):
+    resp = get_session().post(BACKEND + "/upload", files={"file": (name, raw)})
+    resp.raise_for_status()
+    return resp.json()
+
+
+@st.cache_data(max_entries=4, show_spinner=False)
+def _file_rows(digest: str, name: str, _raw: bytes):
+    # Only used when the backend has no bucket to read the file back from.
+    # Cached once per file for the whole process instead of per browser session.
+    ext = name.split(".")[-1].lower()
+    if ext == "csv":
+        df = pd.read_csv(io.BytesIO(_raw))
+    elif ext in ["xlsx", "xls"]:
+        df = pd.read_excel(io.BytesIO(_raw))
+    elif ext == "json":
+        df = pd.read_json(io.BytesIO(_raw))
+    else:
+        return None
+    return json.loads(df.to_json(orient="records"))
+
+
+def forget_file():
+    # Drop the previous file so the summary / file Q&A sections hide
+    for key in ("file_digest", "file_summary", "file_charts", "gcs_path"):
+        st.session_state.pop(key, None)
+
+
 def show_summary_block(summary):
     st.subheader("📊 Data Summary")
 
@@ -74,48 +143,34 @@ uploaded_file = st.file_uploader(
 )
 
 if uploaded_file:
-    st.success("File uploaded. Processing…")
+    raw = uploaded_file.getvalue()
+    digest = hashlib.sha256(raw).hexdigest()
 
     # -----------------------------------------------------
-    # SEND FILE TO BACKEND
+    # SEND FILE TO BACKEND (once per file content)
     # -----------------------------------------------------
-    files = {"file": (uploaded_file.name, uploaded_file.getvalue())}
-    resp, err = api_post("/upload", files=files)
-
-    if err:
-        st.error(f"Backend Error: {err}")
-    else:
-        summary = resp.get("summary")
-        charts = resp.get("charts")
-        gcs_path = resp.get("gcs_path")
-
-        st.session_state["file_summary"] = summary
-        st.session_state["file_charts"] = charts
-        st.session_state["gcs_path"] = gcs_path
-
-        # -------------------------------------------------
-        # NEW ⭐: Store actual dataframe rows (for NL queries)
-        # -------------------------------------------------
+    if st.session_state.get("file_digest") != digest:
+        st.success("File uploaded. Processing…")
         try:
-            ext = uploaded_file.name.split(".")[-1].lower()
-            if ext == "csv":
-                df = pd.read_csv(uploaded_file)
-            elif ext in ["xlsx", "xls"]:
-                df = pd.read_excel(uploaded_file)
-            elif ext == "json":
-                df = pd.read_json(uploaded_file)
-            else:
-                df = None
-
-            if df is not None:
-                st.session_state["file_data_rows"] = df.to_dict(orient="records")
-
+            resp, err = upload_file(uploaded_file.name, raw), None
         except Exception as e:
-            st.error(f"Failed to parse file locally: {e}")
+            resp, err = None, _error_text(e)
 
-        # -------------------------------------------------
-        show_summary_block(summary)
-        show_charts(charts)
+        if err:
+            forget_file()
+            st.error(f"Backend Error: {err}")
+        else:
+            st.session_state["file_digest"] = digest
+            st.session_state["file_summary"] = resp.get("summary")
+            st.session_state["file_charts"] = resp.get("charts")
+            st.session_state["gcs_path"] = resp.get("gcs_path")
+
+    if st.session_state.get("file_digest") == digest:
+        show_summary_block(st.session_state["file_summary"])
+        show_charts(st.session_state["file_charts"])
+else:
+    # Uploader cleared
+    forget_file()
 
 
 # =========================================================
@@ -125,6 +180,7 @@ if "file_summary" in st.session_state:
     st.header("📊 Full Summary")
     if st.button("Refresh Summary"):
         payload = {"gcs_path": st.session_state["gcs_path"]}
+        # bypasses the cache: this button must fetch a fresh summary
         resp, err = api_post("/summarize", data=payload)
 
         if err:
@@ -146,17 +202,17 @@ if "file_summary" in st.session_state:
         if not q.strip():
             st.warning("Please enter a question.")
         else:
-            payload = {
-                "question": q,
-
-                # ⭐ ALWAYS send actual file rows so backend never errors
-                "data": st.session_state.get("file_data_rows"),
-
-                # Fallback if backend still wants gcs_path
-                "gcs_path": st.session_state.get("gcs_path")
-            }
+            payload = {"question": q}
+            gcs_path = st.session_state.get("gcs_path")
+            if gcs_path:
+                # Backend reads the file from GCS; no need to ship the rows
+                payload["gcs_path"] = gcs_path
+            else:
+                payload["data"] = _file_rows(
+                    st.session_state["file_digest"], uploaded_file.name, uploaded_file.getvalue()
+                )
 
-            resp, err = api_post("/nl_query_file", data=payload)
+            resp, err = cached_api_post("/nl_query_file", payload, st.session_state.get("file_digest", ""))
             if err:
                 st.error(f"Backend Error: {err}")
             else:
@@ -176,6 +232,7 @@ if st.button("1️⃣ Generate SQL"):
     if not q2.strip():
         st.warning("Enter a question.")
     else:
+        # not cached: the answer may be the rule-based fallback while Vertex is degraded
         resp, err = api_post("/debug_sql", data={"question": q2})
         if err:
             st.error(f"Backend Error: {err}")